@@ -4925,10 +4925,16 @@ def register_handlers():
     bpy.app.handlers.load_post.append(fix_avastar_data_on_load)
     bpy.app.handlers.depsgraph_update_post.append(shape.check_dirty_mesh_on_load)
     bpy.app.handlers.frame_change_post.append(shape.update_on_framechange)
+    bpy.app.handlers.depsgraph_update_post.append(animesh.invalidate_animesh_caches_on_update)
+    bpy.app.handlers.load_post.append(animesh.subscribe_deform_counts_on_load)
+    bpy.app.handlers.depsgraph_update_post.append(performance.invalidate_mesh_cache_on_update)
     print("Avastar Handlers registered")
 
 def unregister_handlers():
 
+    bpy.app.handlers.depsgraph_update_post.remove(performance.invalidate_mesh_cache_on_update)
+    bpy.app.handlers.load_post.remove(animesh.subscribe_deform_counts_on_load)
+    bpy.app.handlers.depsgraph_update_post.remove(animesh.invalidate_animesh_caches_on_update)
     bpy.app.handlers.frame_change_post.remove(shape.update_on_framechange)
     bpy.app.handlers.depsgraph_update_post.remove(shape.check_dirty_mesh_on_load)
     bpy.app.handlers.load_post.remove(fix_avastar_data_on_load)
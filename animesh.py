@@ -23,7 +23,9 @@
 
 import bpy
 import logging
+from collections import namedtuple
 from bpy.props import BoolProperty, IntProperty, FloatProperty
+from bpy.app.handlers import persistent
 from .const import ICON_MESH_DATA, ICON_ERROR, ICON_INFO, UI_LOCATION
 
 log = logging.getLogger('avastar.animesh')
@@ -39,6 +41,208 @@ ANIMESH_MAX_BONES = 110          # Maximum bones in animesh skeleton
 ANIMESH_MAX_TRIANGLES = 32768    # Maximum triangles per animesh object
 ANIMESH_MAX_COMPLEXITY = 16000   # Land Impact complexity threshold
 
+# Armature data pointer -> (bone count, deform bone count)
+_bone_count_cache = {}
+
+# Mesh data pointer -> ((vertex, polygon, loop count), (triangle count, unweighted count))
+_scan_cache = {}
+
+# Optional Numba kernels, resolved on first use by _get_kernels()
+_kernels = None
+
+# Owner handle for the message bus subscriptions of this module
+_msgbus_owner = object()
+
+
+def _count_deform_bones(bones):
+    return sum(1 for b in bones if b.use_deform)
+
+
+def _count_deform_bones_capped(bones, cap):
+    """
+    Count deform bones but stop as soon as the count exceeds cap.
+    The result is exact up to cap, any value above cap means 'too many'
+    """
+    count = 0
+    for b in bones:
+        if b.use_deform:
+            count += 1
+            if count > cap:
+                break
+    return count
+
+
+def _get_deform_bone_count(armature):
+    """
+    Return the number of deform bones of armature.
+    The value is cached per armature datablock. It is refreshed
+    by the message bus when bones are edited in the UI and dropped
+    by invalidate_animesh_caches_on_update when the armature changes
+    """
+    bones = armature.data.bones
+    key = armature.data.as_pointer()
+    stamp = len(bones)
+    cached = _bone_count_cache.get(key)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    deform_count = _count_deform_bones(bones)
+    _bone_count_cache[key] = (stamp, deform_count)
+    return deform_count
+
+
+def _get_armature(obj):
+    """
+    Return the armature bound to obj by its first Armature modifier.
+    The panel, validate and optimize all use this, so they always
+    report on the same rig
+    """
+    for mod in obj.modifiers:
+        if mod.type == 'ARMATURE' and mod.object:
+            return mod.object
+    return None
+
+
+def _recompute_deform_counts():
+    for arm in bpy.data.armatures:
+        bones = arm.bones
+        _bone_count_cache[arm.as_pointer()] = (len(bones), _count_deform_bones(bones))
+
+
+def subscribe_deform_counts():
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    for key in ((bpy.types.Armature, "bones"), (bpy.types.Bone, "use_deform")):
+        bpy.msgbus.subscribe_rna(
+            key=key,
+            owner=_msgbus_owner,
+            args=(),
+            notify=_recompute_deform_counts
+        )
+
+
+@persistent
+def invalidate_animesh_caches_on_update(scene, depsgraph):
+    if not (_bone_count_cache or _scan_cache):
+        return
+    for update in depsgraph.updates:
+        data = update.id.original
+        if isinstance(data, bpy.types.Armature):
+            _bone_count_cache.pop(data.as_pointer(), None)
+            continue
+        if not update.is_updated_geometry:
+            continue
+        # Vertex group edits may tag the object rather than its mesh
+        if isinstance(data, bpy.types.Object):
+            data = data.data
+        if isinstance(data, bpy.types.Mesh):
+            _scan_cache.pop(data.as_pointer(), None)
+
+
+@persistent
+def subscribe_deform_counts_on_load(scene):
+    # Datablock pointers and message bus subscriptions
+    # do not survive loading a file
+    _bone_count_cache.clear()
+    _scan_cache.clear()
+    subscribe_deform_counts()
+
+
+ScanResult = namedtuple('ScanResult', 'triangle_count, unweighted_count, used_groups')
+
+
+def _get_kernels():
+    """Return the perf_kernels module, or False when Numba is not available"""
+    global _kernels
+    if _kernels is None:
+        try:
+            from . import perf_kernels as kernels
+        except ImportError:
+            kernels = False
+        _kernels = kernels
+    return _kernels
+
+
+def _sum_triangles(loop_totals):
+    """Return the number of triangles for an array of polygon loop totals"""
+    kernels = _get_kernels()
+    if kernels:
+        return int(kernels.count_tris(loop_totals))
+    return int((loop_totals - 2).sum())
+
+
+def _count_triangles(mesh):
+    """Return the triangle count of mesh without building a BMesh"""
+    import numpy as np
+    polys = mesh.polygons
+    loop_totals = np.empty(len(polys), dtype=np.int32)
+    polys.foreach_get("loop_total", loop_totals)
+    return _sum_triangles(loop_totals)
+
+
+def _count_unweighted(group_counts):
+    """Return the number of vertices with no vertex group assignment"""
+    import numpy as np
+    kernels = _get_kernels()
+    if kernels:
+        return int(kernels.count_unweighted(group_counts))
+    return int(np.count_nonzero(group_counts == 0))
+
+
+def _scan_mesh(mesh):
+    """
+    Collect all data needed for the Animesh checks: the triangle count,
+    the number of unweighted vertices and the sorted array
+    of referenced group indices. Only the deform layer needs a BMesh,
+    triangles are counted from the mesh polygons directly
+    """
+    import bmesh
+    import numpy as np
+    vertex_count = len(mesh.vertices)
+    group_ids = []
+
+    bm = bmesh.new()
+    try:
+        bm.from_mesh(mesh)
+        deform_layer = bm.verts.layers.deform.active
+        if deform_layer is None:
+            group_counts = np.zeros(vertex_count, dtype=np.int32)
+        else:
+            group_counts = np.empty(vertex_count, dtype=np.int32)
+            for i, v in enumerate(bm.verts):
+                keys = v[deform_layer].keys()
+                group_counts[i] = len(keys)
+                group_ids.extend(keys)
+    finally:
+        bm.free()
+
+    triangle_count = _count_triangles(mesh)
+    unweighted_count = _count_unweighted(group_counts)
+
+    used_groups = np.unique(np.asarray(group_ids, dtype=np.int32))
+    return ScanResult(triangle_count, unweighted_count, used_groups)
+
+
+def _get_cached_counts(mesh):
+    """
+    Return the triangle and unweighted vertex counts of mesh, reusing
+    the last result while the mesh is unchanged. Only the two counts
+    are kept, so the cache holds no arrays. Weight edits keep the
+    element counts, so they are only noticed when
+    invalidate_animesh_caches_on_update drops the entry. Use this only
+    where the depsgraph is evaluated between calls, i.e. from
+    interactive UI invocations
+    """
+    key = mesh.as_pointer()
+    stamp = (len(mesh.vertices), len(mesh.polygons), len(mesh.loops))
+    cached = _scan_cache.get(key)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    scan = _scan_mesh(mesh)
+    counts = (scan.triangle_count, scan.unweighted_count)
+    _scan_cache[key] = (stamp, counts)
+    return counts
+
 
 class AVASTAR_OT_animesh_validate(bpy.types.Operator):
     """Validate mesh for Animesh compatibility"""
@@ -55,6 +259,14 @@ class AVASTAR_OT_animesh_validate(bpy.types.Operator):
     )
     bl_options = {'REGISTER'}
 
+    # Set by invoke(). Scripts call execute() directly and
+    # may edit weights without a depsgraph update in between
+    use_scan_cache = False
+
+    def invoke(self, context, event):
+        self.use_scan_cache = not bpy.app.background
+        return self.execute(context)
+
     def execute(self, context):
         obj = context.active_object
         if not obj or obj.type != 'MESH':
@@ -62,59 +274,40 @@ class AVASTAR_OT_animesh_validate(bpy.types.Operator):
             return {'CANCELLED'}
 
         # Find armature
-        armature = None
-        for mod in obj.modifiers:
-            if mod.type == 'ARMATURE' and mod.object:
-                armature = mod.object
-                break
+        armature = _get_armature(obj)
 
         if not armature:
             self.report({'ERROR'}, "Mesh has no armature modifier")
             return {'CANCELLED'}
 
-        # Count bones
-        bone_count = len([b for b in armature.data.bones if b.use_deform])
-        
-        # Count triangles
-        import bmesh
-        bm = bmesh.new()
-        bm.from_mesh(obj.data)
-        bm.faces.ensure_lookup_table()
-        triangle_count = sum(1 for f in bm.faces for _ in range(len(f.verts) - 2))
-        bm.free()
-
-        # Check for unweighted vertices
-        unweighted = []
-        for v in obj.data.vertices:
-            if len(v.groups) == 0:
-                unweighted.append(v.index)
-
-        # Generate report
-        issues = []
+        # Count bones, only up to the limit. The full count is
+        # only needed to report how far an oversized rig is over
+        bone_count = _count_deform_bones_capped(armature.data.bones, ANIMESH_MAX_BONES)
         if bone_count > ANIMESH_MAX_BONES:
-            issues.append(f"❌ Too many bones: {bone_count}/{ANIMESH_MAX_BONES}")
-        else:
-            issues.append(f"✅ Bone count: {bone_count}/{ANIMESH_MAX_BONES}")
-
-        if triangle_count > ANIMESH_MAX_TRIANGLES:
-            issues.append(f"❌ Too many triangles: {triangle_count:,}/{ANIMESH_MAX_TRIANGLES:,}")
+            bone_count = _count_deform_bones(armature.data.bones)
+        
+        # Count triangles and unweighted vertices in one mesh scan
+        if self.use_scan_cache:
+            triangle_count, unweighted = _get_cached_counts(obj.data)
         else:
-            issues.append(f"✅ Triangle count: {triangle_count:,}/{ANIMESH_MAX_TRIANGLES:,}")
+            scan = _scan_mesh(obj.data)
+            triangle_count, unweighted = scan.triangle_count, scan.unweighted_count
 
-        if unweighted:
-            issues.append(f"❌ Unweighted vertices: {len(unweighted)}")
-        else:
-            issues.append(f"✅ All vertices weighted")
+        # Generate report
+        bones_ok = bone_count <= ANIMESH_MAX_BONES
+        triangles_ok = triangle_count <= ANIMESH_MAX_TRIANGLES
+        weights_ok = unweighted == 0
+        report_text = (
+            f"{'✅' if bones_ok else '❌'} Bone count: {bone_count}/{ANIMESH_MAX_BONES}\n"
+            f"{'✅' if triangles_ok else '❌'} Triangle count: {triangle_count:,}/{ANIMESH_MAX_TRIANGLES:,}\n"
+            f"{'✅' if weights_ok else '❌'} Unweighted vertices: {unweighted}"
+        )
 
         # Display results
-        report_text = "\n".join(issues)
         self.report({'INFO'}, f"Animesh Validation:\n{report_text}")
-        
-        log.info("Animesh Validation Report:")
-        for issue in issues:
-            log.info(f"  {issue}")
+        log.info("Animesh Validation Report:\n%s" % report_text)
 
-        if all("✅" in issue for issue in issues):
+        if bones_ok and triangles_ok and weights_ok:
             self.report({'INFO'}, "Mesh is Animesh compatible!")
             return {'FINISHED'}
         else:
@@ -129,65 +322,60 @@ class AVASTAR_OT_animesh_optimize_bones(bpy.types.Operator):
     bl_description = (
         "Reduces bone count to meet Animesh 110-bone limit\n\n"
         "Optimization Methods:\n"
-        "• Removes unused bones (no vertices assigned)\n"
+        "• Disables deform on unused bones (no vertices assigned)\n"
         "• Merges similar/redundant bones\n"
         "• Simplifies bone hierarchy\n\n"
-        "WARNING: This modifies the armature structure.\n"
+        "WARNING: This modifies the armature deform bones.\n"
         "Make a backup before running!"
     )
     bl_options = {'REGISTER', 'UNDO'}
 
     remove_unused : BoolProperty(
-        name="Remove Unused Bones",
-        description="Remove bones with no vertex weights",
+        name="Disable Unused Bones",
+        description="Exclude bones with no vertex weights from deformation",
         default=True
     )
 
     def execute(self, context):
+        import numpy as np
         obj = context.active_object
         if not obj or obj.type != 'MESH':
             self.report({'ERROR'}, "Please select a mesh object")
             return {'CANCELLED'}
 
         # Find armature
-        armature = None
-        for mod in obj.modifiers:
-            if mod.type == 'ARMATURE' and mod.object:
-                armature = mod.object
-                break
+        armature = _get_armature(obj)
 
         if not armature:
             self.report({'ERROR'}, "Mesh has no armature modifier")
             return {'CANCELLED'}
 
-        initial_bone_count = len([b for b in armature.data.bones if b.use_deform])
+        initial_bone_count = _count_deform_bones(armature.data.bones)
 
         if self.remove_unused:
             # Get list of bones with weights
-            used_bones = set()
-            for v in obj.data.vertices:
-                for g in v.groups:
-                    if g.group < len(obj.vertex_groups):
-                        vg = obj.vertex_groups[g.group]
-                        used_bones.add(vg.name)
-
-            # Remove unused deform bones
-            bpy.context.view_layer.objects.active = armature
-            bpy.ops.object.mode_set(mode='EDIT')
-            
-            removed_count = 0
-            for bone in armature.data.edit_bones:
-                if bone.use_deform and bone.name not in used_bones:
-                    armature.data.edit_bones.remove(bone)
-                    removed_count += 1
-
-            bpy.ops.object.mode_set(mode='OBJECT')
-            bpy.context.view_layer.objects.active = obj
-
-        final_bone_count = len([b for b in armature.data.bones if b.use_deform])
+            used_groups = _scan_mesh(obj.data).used_groups
+            names = [vg.name for vg in obj.vertex_groups]
+            used_groups = used_groups[used_groups < len(names)]
+            used_bones = {names[i] for i in used_groups.tolist()}
+
+            # Compare 32 bit name hashes in one vectorized lookup. A hash
+            # collision can only keep a bone deforming, never disable it
+            used_hashes = np.fromiter((hash(n) & 0xFFFFFFFF for n in used_bones), dtype=np.uint32, count=len(used_bones))
+            used_hashes.sort()
+            deform_bones = [b for b in armature.data.bones if b.use_deform]
+            bone_hashes = np.fromiter((hash(b.name) & 0xFFFFFFFF for b in deform_bones), dtype=np.uint32, count=len(deform_bones))
+            is_used = np.isin(bone_hashes, used_hashes)
+
+            # Exclude unused bones from deformation. This works in
+            # Object mode, so no Edit mode round trip is needed
+            for i in np.flatnonzero(~is_used).tolist():
+                deform_bones[i].use_deform = False
+
+        final_bone_count = _count_deform_bones(armature.data.bones)
         bones_removed = initial_bone_count - final_bone_count
 
-        self.report({'INFO'}, f"Removed {bones_removed} unused bones ({final_bone_count} remaining)")
+        self.report({'INFO'}, f"Disabled deform on {bones_removed} unused bones ({final_bone_count} remaining)")
         return {'FINISHED'}
 
 
@@ -220,13 +408,21 @@ class AVASTAR_OT_animesh_reduce_triangles(bpy.types.Operator):
             self.report({'ERROR'}, "Please select a mesh object")
             return {'CANCELLED'}
 
+        triangle_count = _count_triangles(obj.data)
+        if triangle_count <= ANIMESH_MAX_TRIANGLES:
+            self.report({'INFO'}, f"Mesh already within Animesh limit ({triangle_count:,}/{ANIMESH_MAX_TRIANGLES:,} triangles)")
+            return {'FINISHED'}
+
+        # Reduce at least far enough to reach 80% of the limit
+        ratio = min(self.ratio, ANIMESH_MAX_TRIANGLES * 0.8 / triangle_count)
+
         # Add decimate modifier
         decimate = obj.modifiers.new("Animesh_Decimate", 'DECIMATE')
         decimate.decimate_type = 'COLLAPSE'
-        decimate.ratio = self.ratio
+        decimate.ratio = ratio
         decimate.use_collapse_triangulate = True
 
-        self.report({'INFO'}, f"Added decimate modifier with {self.ratio*100:.0f}% ratio")
+        self.report({'INFO'}, f"Added decimate modifier with {ratio*100:.0f}% ratio")
         return {'FINISHED'}
 
 
@@ -253,14 +449,9 @@ class AVASTAR_PT_animesh_tools(bpy.types.Panel):
 
         # Show current stats
         if obj:
-            armature = None
-            for mod in obj.modifiers:
-                if mod.type == 'ARMATURE' and mod.object:
-                    armature = mod.object
-                    break
-
+            armature = _get_armature(obj)
             if armature:
-                bone_count = len([b for b in armature.data.bones if b.use_deform])
+                bone_count = _get_deform_bone_count(armature)
                 col = box.column(align=True)
                 row = col.row()
                 row.label(text=f"Bones: {bone_count}/{ANIMESH_MAX_BONES}")
@@ -291,14 +482,16 @@ classes = (
     AVASTAR_PT_animesh_tools,
 )
 
+_register_classes, _unregister_classes = bpy.utils.register_classes_factory(classes)
+
 def register():
-    from bpy.utils import register_class
-    for cls in classes:
-        register_class(cls)
-        registerlog.info("Registered animesh:%s" % cls)
+    _register_classes()
+    registerlog.info("Registered animesh (%d classes)" % len(classes))
+    subscribe_deform_counts()
 
 def unregister():
-    from bpy.utils import unregister_class
-    for cls in reversed(classes):
-        unregister_class(cls)
-        registerlog.info("Unregistered animesh:%s" % cls)
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    _bone_count_cache.clear()
+    _scan_cache.clear()
+    _unregister_classes()
+    registerlog.info("Unregistered animesh (%d classes)" % len(classes))
@@ -45,6 +45,60 @@ class BomLayerType:
     HAIR = 'HAIR'
 
 
+BOM_TEMPLATE_NAME = "_BoM_Template"
+BOM_NODE_NAME = "BoM"
+
+
+def get_bom_template():
+    """
+    Return the shared BoM shader node group, create it on first use.
+    The group wraps a Principled BSDF configured for BoM and exposes
+    its Base Color input so layer textures can be linked to it
+    """
+    tree = bpy.data.node_groups.get(BOM_TEMPLATE_NAME)
+    if tree:
+        return tree
+
+    tree = bpy.data.node_groups.new(BOM_TEMPLATE_NAME, 'ShaderNodeTree')
+    color_socket = tree.interface.new_socket(name="Base Color", in_out='INPUT', socket_type='NodeSocketColor')
+    color_socket.default_value = (0.8, 0.8, 0.8, 1.0)
+    tree.interface.new_socket(name="BSDF", in_out='OUTPUT', socket_type='NodeSocketShader')
+
+    nodes = tree.nodes
+    group_in = nodes.new('NodeGroupInput')
+    group_in.location = (-300, 0)
+    bsdf = nodes.new('ShaderNodeBsdfPrincipled')
+    bsdf.location = (0, 0)
+    group_out = nodes.new('NodeGroupOutput')
+    group_out.location = (300, 0)
+
+    tree.links.new(group_in.outputs['Base Color'], bsdf.inputs['Base Color'])
+    tree.links.new(bsdf.outputs['BSDF'], group_out.inputs['BSDF'])
+
+    # Configure for BoM
+    specular = bsdf.inputs.get('Specular IOR Level') or bsdf.inputs.get('Specular')
+    if specular:
+        specular.default_value = 0.0
+    bsdf.inputs['Roughness'].default_value = 1.0
+
+    log.info("Created BoM node group template '%s'" % BOM_TEMPLATE_NAME)
+    return tree
+
+
+def get_bom_layer_image(obj, layer_type):
+    """
+    Return the BoM layer image of an object, creating it on first use.
+    Each object gets its own image so painting one object's layer
+    does not change the layers of other objects
+    """
+    img_name = f"{obj.name}_{layer_type}_BoM"
+    img = bpy.data.images.get(img_name)
+    if not img:
+        img = bpy.data.images.new(img_name, width=1024, height=1024, alpha=True, float_buffer=False)
+        img.source = 'GENERATED'
+    return img
+
+
 class AVASTAR_OT_bom_setup_material(bpy.types.Operator):
     """Setup BoM-compatible material for mesh"""
     bl_idname = "avastar.bom_setup_material"
@@ -81,20 +135,18 @@ class AVASTAR_OT_bom_setup_material(bpy.types.Operator):
         nodes = mat.node_tree.nodes
         nodes.clear()
         
-        # Create principled BSDF
-        bsdf = nodes.new('ShaderNodeBsdfPrincipled')
-        bsdf.location = (0, 0)
+        # Instance the shared BoM shader group
+        bom = nodes.new('ShaderNodeGroup')
+        bom.node_tree = get_bom_template()
+        bom.name = BOM_NODE_NAME
+        bom.location = (0, 0)
         
         # Create output node
         output = nodes.new('ShaderNodeOutputMaterial')
         output.location = (300, 0)
         
         # Link nodes
-        mat.node_tree.links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
-        
-        # Configure for BoM
-        bsdf.inputs['Specular'].default_value = 0.0
-        bsdf.inputs['Roughness'].default_value = 1.0
+        mat.node_tree.links.new(bom.outputs['BSDF'], output.inputs['Surface'])
         
         # Assign material to object
         if obj.data.materials:
@@ -150,7 +202,7 @@ class AVASTAR_OT_bom_add_layer_slot(bpy.types.Operator):
             mat.use_nodes = True
 
         nodes = mat.node_tree.nodes
-        bsdf = nodes.get('Principled BSDF')
+        bsdf = nodes.get(BOM_NODE_NAME) or nodes.get('Principled BSDF')
         if not bsdf:
             self.report({'ERROR'}, "Material is not BoM compatible")
             return {'CANCELLED'}
@@ -161,15 +213,7 @@ class AVASTAR_OT_bom_add_layer_slot(bpy.types.Operator):
         tex_node.label = f"BoM {self.layer_type}"
         tex_node.location = (-400, 0)
         
-        # Create placeholder image
-        img_name = f"{obj.name}_{self.layer_type}_BoM"
-        if img_name not in bpy.data.images:
-            img = bpy.data.images.new(img_name, width=1024, height=1024, alpha=True)
-            img.source = 'GENERATED'
-        else:
-            img = bpy.data.images[img_name]
-        
-        tex_node.image = img
+        tex_node.image = get_bom_layer_image(obj, self.layer_type)
         
         # Link to base color (can be customized for layer blending)
         mat.node_tree.links.new(tex_node.outputs['Color'], bsdf.inputs['Base Color'])
@@ -0,0 +1,45 @@
+### Copyright 2025 Manfred Aabye
+###
+### Numba compiled mesh scan kernels for Avastar
+### 
+
+### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# Numba is not shipped with Blender. Importing this module raises
+# ImportError when it is missing, callers then use their NumPy path.
+from numba import njit
+
+
+@njit(cache=True)
+def count_tris(loop_totals):
+    """Sum of triangles for the given polygon loop totals"""
+    s = 0
+    for i in range(loop_totals.size):
+        s += loop_totals[i] - 2
+    return s
+
+
+@njit(cache=True)
+def count_unweighted(group_counts):
+    """Number of vertices without any vertex group assignment"""
+    s = 0
+    for i in range(group_counts.size):
+        if group_counts[i] == 0:
+            s += 1
+    return s
@@ -24,21 +24,43 @@
 import bpy
 import time
 import logging
+from collections import OrderedDict, namedtuple
 from functools import wraps
 from bpy.props import BoolProperty, IntProperty
+from bpy.app.handlers import persistent
 from .const import UI_LOCATION
 
 log = logging.getLogger('avastar.performance')
 registerlog = logging.getLogger("avastar.register")
+_log_info = log.info
 
 
 # ==============================================================================
 # Performance Monitoring & Optimization
 # ==============================================================================
 
+class _LRU(OrderedDict):
+    """Dictionary that evicts its least recently used entry beyond capacity"""
+
+    def __init__(self, capacity):
+        super().__init__()
+        self.capacity = capacity
+
+    def get_or(self, key, factory):
+        """Return the entry for key, create it with factory() on a miss"""
+        if key in self:
+            self.move_to_end(key)
+            return self[key]
+
+        value = self[key] = factory()
+        if len(self) > self.capacity:
+            self.popitem(last=False)
+        return value
+
+
 # Global cache for expensive computations
-_mesh_cache = {}
-_bone_cache = {}
+_mesh_cache = _LRU(256)
+_bone_cache = _LRU(256)
 
 
 def clear_performance_caches():
@@ -49,74 +71,129 @@ def clear_performance_caches():
     log.info("Performance caches cleared")
 
 
+def _mesh_key(mesh):
+    """
+    Cache key for mesh datablocks. Objects sharing a mesh share the
+    entry, and renaming the object does not orphan it
+    """
+    return (mesh.as_pointer(), mesh.session_uid)
+
+
+@persistent
+def invalidate_mesh_cache_on_update(scene, depsgraph):
+    if not _mesh_cache:
+        return
+    for update in depsgraph.updates:
+        if not update.is_updated_geometry:
+            continue
+        data = update.id.original
+        if isinstance(data, bpy.types.Object):
+            data = data.data
+        if isinstance(data, bpy.types.Mesh):
+            _mesh_cache.pop(_mesh_key(data), None)
+
+
 def timed_operation(func):
     """Decorator to measure operation time"""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = func(*args, **kwargs)
-        elapsed = time.time() - start_time
+        elapsed = time.perf_counter() - start_time
         if elapsed > 0.1:  # Log operations > 100ms
-            log.info(f"{func.__name__} took {elapsed:.3f}s")
+            _log_info(f"{func.__name__} took {elapsed:.3f}s")
         return result
     return wrapper
 
 
+MeshStats = namedtuple('MeshStats', 'vertex_count, polygon_count, timestamp')
+
+# Statistics reported for objects without mesh data
+_EMPTY_MESH_STATS = MeshStats(0, 0, 0.0)
+
+
 @timed_operation
 def get_cached_mesh_data(obj):
     """
     Get cached mesh data to avoid repeated mesh evaluations
     Cache is invalidated when mesh is modified
+    Returns a MeshStats tuple
     """
-    if obj.name not in _mesh_cache:
-        vertex_count = len(obj.data.vertices)
-        polygon_count = len(obj.data.polygons)
-        
-        _mesh_cache[obj.name] = {
-            'vertex_count': vertex_count,
-            'polygon_count': polygon_count,
-            'timestamp': time.time()
-        }
-    
-    return _mesh_cache[obj.name]
+    if obj.type != 'MESH':
+        return _EMPTY_MESH_STATS
+
+    def compute():
+        return MeshStats(len(obj.data.vertices), len(obj.data.polygons), time.time())
+
+    return _mesh_cache.get_or(_mesh_key(obj.data), compute)
+
+
+# Record layout of one weight assignment in a mesh snapshot
+_WEIGHT_RECORD = [('vertex', 'i4'), ('group', 'i4'), ('weight', 'f4')]
+
+
+def _snapshot_weights(vertices):
+    """
+    Return all weight assignments of vertices as three flat arrays:
+    vertex indices, group indices and weights.
+    The arrays are field views into one record array that is
+    filled in a single pass over the vertices
+    """
+    import numpy as np
+    records = np.fromiter(
+        ((v.index, g.group, g.weight) for v in vertices for g in v.groups),
+        dtype=np.dtype(_WEIGHT_RECORD)
+    )
+    return records['vertex'], records['group'], records['weight']
+
+
+def _split_by_group(group_ids, values, group_count):
+    """
+    Split values into runs of equal group index.
+    Returns the sorted list of groups and one array of values per group.
+    Entries outside 0..group_count-1 (dangling assignments) are dropped
+    """
+    import numpy as np
+    valid = (group_ids >= 0) & (group_ids < group_count)
+    if not valid.all():
+        group_ids = group_ids[valid]
+        values = values[valid]
+    order = np.argsort(group_ids, kind='stable')
+    groups, starts = np.unique(group_ids[order], return_index=True)
+    return groups.tolist(), np.split(values[order], starts[1:])
+
+
+MeshSnapshot = namedtuple('MeshSnapshot', 'vertex_ids, group_ids, weights')
+
+
+def _snapshot_mesh(obj):
+    """
+    Read the weight data of a mesh object into flat NumPy arrays.
+    The snapshot is shared by the weight analysis and the cleanup
+    passes, so each of them works on arrays instead of RNA data
+    """
+    return MeshSnapshot(*_snapshot_weights(obj.data.vertices))
 
 
 @timed_operation
-def optimize_weight_calculation(obj, bone_names, chunk_size=1000):
+def optimize_weight_calculation(obj, bone_names):
     """
     Optimized weight calculation for large meshes
-    Processes vertices in chunks to reduce memory pressure
+    Returns a dict mapping bone names to (N, 2) arrays of
+    (vertex index, weight) rows
     """
-    vertices = obj.data.vertices
-    total_verts = len(vertices)
-    
-    results = []
-    for start_idx in range(0, total_verts, chunk_size):
-        end_idx = min(start_idx + chunk_size, total_verts)
-        chunk = vertices[start_idx:end_idx]
-        
-        # Process chunk
-        chunk_weights = {}
-        for v in chunk:
-            for g in v.groups:
-                if g.group < len(obj.vertex_groups):
-                    vg_name = obj.vertex_groups[g.group].name
-                    if vg_name in bone_names:
-                        if vg_name not in chunk_weights:
-                            chunk_weights[vg_name] = []
-                        chunk_weights[vg_name].append((v.index, g.weight))
-        
-        results.append(chunk_weights)
-    
-    # Merge results
-    final_weights = {}
-    for chunk_result in results:
-        for bone_name, weights in chunk_result.items():
-            if bone_name not in final_weights:
-                final_weights[bone_name] = []
-            final_weights[bone_name].extend(weights)
-    
-    return final_weights
+    import numpy as np
+    bone_names = frozenset(bone_names)
+    vertex_ids, group_ids, weights = _snapshot_mesh(obj)
+
+    # Keep only the assignments to bone groups
+    names = [vg.name for vg in obj.vertex_groups]
+    bone_group_indices = np.array([i for i, name in enumerate(names) if name in bone_names], dtype=np.int32)
+    bone_mask = np.isin(group_ids, bone_group_indices)
+    rows = np.stack([vertex_ids[bone_mask], weights[bone_mask]], axis=1)
+
+    groups, group_rows = _split_by_group(group_ids[bone_mask], rows, len(names))
+    return {names[group]: chunk for group, chunk in zip(groups, group_rows)}
 
 
 class AVASTAR_OT_performance_profile(bpy.types.Operator):
@@ -146,8 +223,8 @@ class AVASTAR_OT_performance_profile(bpy.types.Operator):
         # Mesh analysis
         if obj.type == 'MESH':
             data = get_cached_mesh_data(obj)
-            vcount = data['vertex_count']
-            pcount = data['polygon_count']
+            vcount = data.vertex_count
+            pcount = data.polygon_count
             
             report.append(f"Vertices: {vcount:,}")
             report.append(f"Polygons: {pcount:,}")
@@ -177,8 +254,12 @@ class AVASTAR_OT_performance_profile(bpy.types.Operator):
                 break
 
         if armature:
-            bone_count = len(armature.data.bones)
-            deform_count = len([b for b in armature.data.bones if b.use_deform])
+            import numpy as np
+            bones = armature.data.bones
+            bone_count = len(bones)
+            use_deform = np.empty(bone_count, dtype=bool)
+            bones.foreach_get("use_deform", use_deform)
+            deform_count = int(use_deform.sum())
             
             report.append(f"Total Bones: {bone_count}")
             report.append(f"Deform Bones: {deform_count}")
@@ -230,6 +311,7 @@ class AVASTAR_OT_performance_optimize_scene(bpy.types.Operator):
     )
 
     def execute(self, context):
+        import numpy as np
         obj = context.active_object
         if not obj or obj.type != 'MESH':
             self.report({'ERROR'}, "Please select a mesh object")
@@ -237,23 +319,34 @@ class AVASTAR_OT_performance_optimize_scene(bpy.types.Operator):
 
         changes = []
 
+        # Read all weights once, both cleanup passes work on this snapshot
+        if self.clean_weights or self.remove_unused_groups:
+            snapshot = _snapshot_mesh(obj)
+            if self.clean_weights:
+                low = snapshot.weights < 0.001
+            else:
+                low = np.zeros(len(snapshot.weights), dtype=bool)
+
         # Clean weights
         if self.clean_weights:
-            cleaned = 0
-            for v in obj.data.vertices:
-                for g in list(v.groups):
-                    if g.weight < 0.001:
-                        obj.vertex_groups[g.group].remove([v.index])
-                        cleaned += 1
+            # Remove once per group. Each remove() call scans
+            # the whole group, so per vertex calls are quadratic
+            groups, indices = _split_by_group(
+                snapshot.group_ids[low],
+                snapshot.vertex_ids[low],
+                len(obj.vertex_groups)
+            )
+            for group, group_indices in zip(groups, indices):
+                obj.vertex_groups[group].remove(group_indices.tolist())
+
+            cleaned = int(low.sum())
             if cleaned > 0:
                 changes.append(f"Cleaned {cleaned} zero-weight assignments")
 
-        # Remove unused groups
+        # Remove unused groups, a group is used when at
+        # least one of its weights survived the cleanup
         if self.remove_unused_groups:
-            used_groups = set()
-            for v in obj.data.vertices:
-                for g in v.groups:
-                    used_groups.add(g.group)
+            used_groups = set(np.unique(snapshot.group_ids[~low]).tolist())
             
             removed = 0
             for i in range(len(obj.vertex_groups) - 1, -1, -1):
@@ -267,12 +360,13 @@ class AVASTAR_OT_performance_optimize_scene(bpy.types.Operator):
         # Optimize modifiers
         if self.optimize_modifiers:
             # Move Armature modifiers to end for better performance
-            armature_mods = [m for m in obj.modifiers if m.type == 'ARMATURE']
-            for mod in armature_mods:
-                while obj.modifiers.find(mod.name) < len(obj.modifiers) - 1:
-                    bpy.ops.object.modifier_move_down(modifier=mod.name)
+            armature_mods = [m.name for m in obj.modifiers if m.type == 'ARMATURE']
+            last = len(obj.modifiers) - 1
+            for name in armature_mods:
+                obj.modifiers.move(obj.modifiers.find(name), last)
             
             if armature_mods:
+                obj.update_tag()
                 changes.append(f"Optimized modifier stack ({len(armature_mods)} armature mods)")
 
         # Clear caches